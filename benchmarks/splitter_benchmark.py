@@ -0,0 +1,63 @@
+"""
+Throughput benchmark: RecursiveCharacterTextSplitter vs FastTextSplitter.
+Run from the repository root: python benchmarks/splitter_benchmark.py [megabytes]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from src.splitting import FastTextSplitter
+
+
+def make_corpus(megabytes: float, seed: int = 0) -> str:
+    """Build a synthetic corpus of paragraphs, lines and the odd unbroken run."""
+    rng = random.Random(seed)
+    words = ["retrieval", "augmented", "generation", "vector", "index", "chunk",
+             "embedding", "query", "document", "context", "a", "of", "the", "is"]
+    target = int(megabytes * 1024 * 1024)
+    parts, size = [], 0
+    while size < target:
+        line = " ".join(rng.choice(words) for _ in range(rng.randint(5, 40)))
+        if rng.random() < 0.01:
+            line += " " + "x" * rng.randint(600, 1200)
+        parts.append(line)
+        parts.append("\n\n" if rng.random() < 0.2 else "\n")
+        size += len(line) + 1
+    return "".join(parts)
+
+
+def measure(name: str, split, text: str, repeats: int = 3) -> list:
+    best = float("inf")
+    chunks = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        chunks = split(text)
+        best = min(best, time.perf_counter() - start)
+    mb = len(text) / (1024 * 1024)
+    print(f"{name:<32} {best:8.3f}s  {mb / best:8.2f} MB/s  {len(chunks)} chunks")
+    return chunks
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    text = make_corpus(megabytes)
+    print(f"Corpus: {len(text) / (1024 * 1024):.1f} MB\n")
+
+    separators = ["\n\n", "\n", " ", ""]
+    baseline = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50, separators=separators)
+    fast = FastTextSplitter(chunk_size=500, chunk_overlap=50, separators=separators)
+
+    expected = measure("RecursiveCharacterTextSplitter", baseline.split_text, text)
+    actual = measure("FastTextSplitter", fast.split_text, text)
+    measure("FastTextSplitter (spans only)", fast.split_spans, text)
+
+    print(f"\nOutputs identical: {expected == actual}")
+
+
+if __name__ == "__main__":
+    main()
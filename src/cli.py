@@ -8,14 +8,20 @@ load_dotenv()
 from src.ingestion import DocumentIngester
 from src.retrieval import VectorStore, Retriever
 from src.generation import AnswerGenerator, RAGPipeline
+from src.evaluation import HashingEmbeddings, evaluate, load_labels
+from src.utils import format_results
 
 
-def ingest_command(data_dir: str):
+def ingest_command(data_dir: str, fast_splitter: bool = False, hierarchical: bool = False, tokens: bool = False):
     if not Path(data_dir).exists():
         print(f"❌ Directory not found: {data_dir}")
         return
     
-    ingester = DocumentIngester()
+    ingester = DocumentIngester(
+        fast_splitter=fast_splitter,
+        parent_chunk_size=2000 if hierarchical else None,
+        token_encoding="cl100k_base" if tokens else None
+    )
     chunks = ingester.ingest_directory(data_dir)
     
     if not chunks:
@@ -23,7 +29,7 @@ def ingest_command(data_dir: str):
         return
     
     vector_store = VectorStore()
-    vector_store.add_documents(chunks)
+    vector_store.add_documents(chunks, parents=ingester.parents)
     vector_store.save()
     
     print(f"✓ Successfully ingested {len(chunks)} chunks from {len(set(c.metadata['source'] for c in chunks))} documents")
@@ -37,7 +43,7 @@ def query_command(query: str, k: int = 4):
         print("❌ No index found. Run 'python src/cli.py ingest data/documents' first.")
         return
     
-    retriever = Retriever(vector_store)
+    retriever = Retriever(vector_store, expand_parents=vector_store.parents is not None)
     generator = AnswerGenerator()
     rag = RAGPipeline(retriever, generator)
     
@@ -53,18 +59,86 @@ def query_command(query: str, k: int = 4):
     print(f"   {result['answer']}\n")
 
 
+def precompute_command(queries_file: str):
+    if not Path(queries_file).exists():
+        print(f"❌ File not found: {queries_file}")
+        return
+    
+    vector_store = VectorStore()
+    try:
+        vector_store.load()
+    except FileNotFoundError:
+        print("❌ No index found. Run 'python src/cli.py ingest data/documents' first.")
+        return
+    
+    queries = Path(queries_file).read_text(encoding="utf-8").splitlines()
+    count = vector_store.precompute_queries(queries)
+    
+    if not count:
+        print("❌ No queries found to precompute")
+        return
+    
+    print(f"✓ Successfully precomputed {count} query embeddings")
+
+
+def evaluate_command(labels_file: str, k: int = 5, offline_dir: str = None, generate: bool = False):
+    if not Path(labels_file).exists():
+        print(f"❌ File not found: {labels_file}")
+        return
+    
+    examples = load_labels(labels_file)
+    
+    if offline_dir is not None:
+        if not Path(offline_dir).exists():
+            print(f"❌ Directory not found: {offline_dir}")
+            return
+        
+        # Deterministic local embeddings: no API key or network needed.
+        ingester = DocumentIngester()
+        chunks = ingester.ingest_directory(offline_dir)
+        for text_file in sorted(Path(offline_dir).glob("*.txt")):
+            chunks.extend(ingester.ingest_text(text_file.read_text(encoding="utf-8"), source=str(text_file)))
+        
+        if not chunks:
+            print("❌ No documents found to ingest")
+            return
+        
+        vector_store = VectorStore(embeddings=HashingEmbeddings())
+        vector_store.add_documents(chunks)
+    else:
+        vector_store = VectorStore()
+        try:
+            vector_store.load()
+        except FileNotFoundError:
+            print("❌ No index found. Run 'python src/cli.py ingest data/documents' first.")
+            return
+    
+    retriever = Retriever(vector_store, expand_parents=vector_store.parents is not None)
+    generator = AnswerGenerator() if generate else None
+    report = evaluate(retriever, examples, ks=(k,), generator=generator)
+    
+    print(f"\n📊 Evaluation over {report['num_queries']} queries:")
+    print(format_results(report))
+
+
 def main():
     if len(sys.argv) < 2:
         print("""
 Usage: python src/cli.py [command] [args]
 
 Commands:
-  ingest <directory>  - Ingest all PDFs from a directory
-  query <query>       - Query the knowledge base
+  ingest <directory> [--fast] [--parents] [--tokens]
+                                           - Ingest all PDFs from a directory
+  query <query>                            - Query the knowledge base
+  precompute <queries_file>                - Embed a query list (one per line) ahead of time
+  evaluate <labels.jsonl> [k] [--offline <directory>] [--generate]
+                                           - Measure retrieval quality and latency
   
 Examples:
   python src/cli.py ingest data/documents
   python src/cli.py query "What is the main topic?"
+  python src/cli.py precompute data/queries.txt
+  python src/cli.py evaluate data/labels.jsonl 5 --offline data/documents
         """)
         return
     
@@ -74,7 +148,12 @@ Examples:
         if len(sys.argv) < 3:
             print("❌ Please specify a directory: python src/cli.py ingest <directory>")
             return
-        ingest_command(sys.argv[2])
+        ingest_command(
+            sys.argv[2],
+            fast_splitter="--fast" in sys.argv[3:],
+            hierarchical="--parents" in sys.argv[3:],
+            tokens="--tokens" in sys.argv[3:]
+        )
     
     elif command == "query":
         if len(sys.argv) < 3:
@@ -84,6 +163,31 @@ Examples:
         k = int(sys.argv[-1]) if sys.argv[-1].isdigit() else 4
         query_command(query_text, k=k)
     
+    elif command == "precompute":
+        if len(sys.argv) < 3:
+            print("❌ Please specify a queries file: python src/cli.py precompute <file>")
+            return
+        precompute_command(sys.argv[2])
+    
+    elif command == "evaluate":
+        if len(sys.argv) < 3:
+            print("❌ Please specify a labels file: python src/cli.py evaluate <labels.jsonl>")
+            return
+        args = sys.argv[3:]
+        offline_dir = None
+        if "--offline" in args:
+            position = args.index("--offline")
+            if position + 1 >= len(args):
+                print("❌ Please specify a directory after --offline")
+                return
+            offline_dir = args[position + 1]
+            del args[position:position + 2]
+        generate = "--generate" in args
+        if generate:
+            args.remove("--generate")
+        k = int(args[0]) if args and args[0].isdigit() else 5
+        evaluate_command(sys.argv[2], k=k, offline_dir=offline_dir, generate=generate)
+    
     else:
         print(f"❌ Unknown command: {command}")
 
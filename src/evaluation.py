@@ -0,0 +1,202 @@
+import hashlib
+import json
+import math
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from src.generation import RAGPipeline
+
+
+class HashingEmbeddings:
+    """Deterministic bag-of-words embeddings for offline evaluation and CI.
+
+    Tokens are hashed into a fixed number of buckets and the vector is
+    L2-normalised, so texts sharing words land close together without any
+    network access.
+    """
+
+    def __init__(self, dimension: int = 256):
+        self.dimension = dimension
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimension, dtype='float32')
+        for token in re.findall(r"\w+", text.lower()):
+            bucket = int.from_bytes(hashlib.md5(token.encode('utf-8')).digest()[:4], 'little')
+            vector[bucket % self.dimension] += 1.0
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+
+class CountingEmbeddings:
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self.query_calls = 0
+        self.document_calls = 0
+        self.documents_embedded = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.document_calls += 1
+        self.documents_embedded += len(texts)
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        self.query_calls += 1
+        return self.embeddings.embed_query(text)
+
+
+def load_labels(path: str) -> List[Dict[str, Any]]:
+    examples = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            example = json.loads(line)
+            if 'query' not in example or not example.get('relevant'):
+                raise ValueError(f"{path}:{line_number}: expected 'query' and a non-empty 'relevant' list")
+            examples.append({'query': example['query'], 'relevant': list(example['relevant'])})
+    return examples
+
+
+class CountingLLM:
+    def __init__(self, llm):
+        self.llm = llm
+        self.calls = 0
+
+    def __call__(self, messages, *args, **kwargs):
+        self.calls += 1
+        return self.llm(messages, *args, **kwargs)
+
+
+class _TimedRetriever:
+    def __init__(self, retriever):
+        self.retriever = retriever
+        self.latencies: List[float] = []
+
+    def retrieve(self, query: str, k: int = 4) -> List[Dict[str, Any]]:
+        start = time.perf_counter()
+        retrieved = self.retriever.retrieve(query, k=k)
+        self.latencies.append(time.perf_counter() - start)
+        return retrieved
+
+
+def evaluate(retriever, examples: List[Dict[str, Any]], ks: Sequence[int] = (1, 3, 5), generator=None) -> Dict[str, Any]:
+    ks = sorted(set(ks))
+    max_k = ks[-1]
+
+    vector_store = retriever.vector_store
+    original_embeddings = vector_store.embeddings
+    embedding_counter = CountingEmbeddings(original_embeddings)
+    vector_store.embeddings = embedding_counter
+
+    timed_retriever = _TimedRetriever(retriever)
+    pipeline = None
+    llm_counter = None
+    if generator is not None:
+        # Answers go through RAGPipeline.answer exactly as in production; the
+        # LLM client is wrapped so every real call is counted.
+        llm_counter = CountingLLM(generator.llm)
+        generator.llm = llm_counter
+        pipeline = RAGPipeline(timed_retriever, generator)
+
+    recalls = {k: [] for k in ks}
+    ndcgs = {k: [] for k in ks}
+    reciprocal_ranks = []
+    answer_latencies = []
+
+    try:
+        for example in examples:
+            if pipeline is not None:
+                start = time.perf_counter()
+                retrieved = pipeline.answer(example['query'], k=max_k)['retrieved_documents']
+                answer_latencies.append(time.perf_counter() - start)
+            else:
+                retrieved = timed_retriever.retrieve(example['query'], k=max_k)
+
+            # Chunk-level ranking: each @k metric only sees retrieved[:k], so its
+            # value does not depend on which other cutoffs are requested.
+            ranking = _rank_relevance(retrieved, example['relevant'])
+            reciprocal_ranks.append(_reciprocal_rank(ranking))
+            for k in ks:
+                recalls[k].append(_recall_at_k(ranking, len(example['relevant']), k))
+                ndcgs[k].append(_ndcg_at_k(ranking, len(example['relevant']), k))
+    finally:
+        vector_store.embeddings = original_embeddings
+        if llm_counter is not None:
+            generator.llm = llm_counter.llm
+
+    report = {
+        'num_queries': len(examples),
+        **{f'recall@{k}': _mean(recalls[k]) for k in ks},
+        f'mrr@{max_k}': _mean(reciprocal_ranks),
+        **{f'ndcg@{k}': _mean(ndcgs[k]) for k in ks},
+        'retrieval_latency_ms': _latency_summary(timed_retriever.latencies),
+        'embedding_calls': {
+            'embed_query': embedding_counter.query_calls,
+            'embed_documents': embedding_counter.document_calls
+        }
+    }
+    if llm_counter is not None:
+        report['llm_calls'] = llm_counter.calls
+        report['answer_latency_ms'] = _latency_summary(answer_latencies)
+    return report
+
+
+def _matches(source: str, label: str) -> bool:
+    return source == label or Path(source).name == label
+
+
+def _rank_relevance(retrieved: List[Dict[str, Any]], relevant: List[str]) -> List[Optional[str]]:
+    # One entry per retrieved chunk: the label it satisfies the first time its
+    # source shows up, otherwise None (irrelevant or a repeat of the same source).
+    ranking = []
+    seen_sources = set()
+    found = set()
+    for result in retrieved:
+        source = result['source']
+        label = None
+        if source not in seen_sources:
+            seen_sources.add(source)
+            label = next((l for l in relevant if l not in found and _matches(source, l)), None)
+            if label is not None:
+                found.add(label)
+        ranking.append(label)
+    return ranking
+
+
+def _recall_at_k(ranking: List[Optional[str]], num_relevant: int, k: int) -> float:
+    return sum(1 for label in ranking[:k] if label is not None) / num_relevant
+
+
+def _reciprocal_rank(ranking: List[Optional[str]]) -> float:
+    for rank, label in enumerate(ranking, 1):
+        if label is not None:
+            return 1.0 / rank
+    return 0.0
+
+
+def _ndcg_at_k(ranking: List[Optional[str]], num_relevant: int, k: int) -> float:
+    dcg = sum(1.0 / math.log2(rank + 1) for rank, label in enumerate(ranking[:k], 1) if label is not None)
+    ideal = sum(1.0 / math.log2(rank + 1) for rank in range(1, min(num_relevant, k) + 1))
+    return dcg / ideal if ideal else 0.0
+
+
+def _mean(values: List[float]) -> float:
+    return round(float(np.mean(values)), 4) if values else 0.0
+
+
+def _latency_summary(latencies: List[float]) -> Dict[str, float]:
+    if not latencies:
+        return {'mean': 0.0, 'p50': 0.0, 'p90': 0.0, 'p95': 0.0, 'p99': 0.0}
+
+    millis = np.array(latencies) * 1000
+    return {
+        'mean': round(float(millis.mean()), 3),
+        **{f'p{p}': round(float(np.percentile(millis, p)), 3) for p in (50, 90, 95, 99)}
+    }
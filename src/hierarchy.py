@@ -0,0 +1,69 @@
+from pathlib import Path
+from typing import List, Optional, Tuple
+import numpy as np
+
+
+class ParentStore:
+    """Parent sections kept as one text blob plus an (n, 2) start/end offset table.
+
+    Parent spans are offsets into the source text, so each source document is
+    stored once no matter how many parents or children reference it.
+    """
+
+    TEXT_FILE = "parents.txt"
+    OFFSETS_FILE = "parents.npy"
+
+    def __init__(self, text: str = "", offsets: Optional[np.ndarray] = None):
+        self._text_parts: List[str] = [text]
+        self._offset_parts: List[np.ndarray] = [
+            offsets if offsets is not None else np.empty((0, 2), dtype=np.int64)
+        ]
+        self._length = len(text)
+        self._count = len(self._offset_parts[0])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, text: str, spans: List[Tuple[int, int]]) -> List[int]:
+        if not spans:
+            return []
+
+        self._offset_parts.append(np.asarray(spans, dtype=np.int64) + self._length)
+        self._text_parts.append(text)
+        self._length += len(text)
+
+        first_id = self._count
+        self._count += len(spans)
+        return list(range(first_id, self._count))
+
+    def get(self, parent_id: int) -> str:
+        start, end = self.offsets[parent_id]
+        return self.text[start:end]
+
+    @property
+    def text(self) -> str:
+        if len(self._text_parts) > 1:
+            self._text_parts = ["".join(self._text_parts)]
+        return self._text_parts[0]
+
+    @property
+    def offsets(self) -> np.ndarray:
+        if len(self._offset_parts) > 1:
+            self._offset_parts = [np.concatenate(self._offset_parts)]
+        return self._offset_parts[0]
+
+    def save(self, directory: Path) -> None:
+        # newline='' keeps \r\n intact so character offsets stay valid on reload.
+        with open(Path(directory) / self.TEXT_FILE, 'w', encoding='utf-8', newline='') as f:
+            f.write(self.text)
+        np.save(Path(directory) / self.OFFSETS_FILE, self.offsets)
+
+    @classmethod
+    def load(cls, directory: Path) -> "ParentStore":
+        with open(Path(directory) / cls.TEXT_FILE, 'r', encoding='utf-8', newline='') as f:
+            text = f.read()
+        return cls(text, np.load(Path(directory) / cls.OFFSETS_FILE))
+
+    @classmethod
+    def exists(cls, directory: Path) -> bool:
+        return (Path(directory) / cls.OFFSETS_FILE).exists()
@@ -0,0 +1,175 @@
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from langchain.schema import Document
+from src.retrieval import VectorStore
+
+
+class IndexManager:
+    """Lazily loads one VectorStore per tenant and keeps them in an LRU cache
+    bounded by a memory budget."""
+
+    def __init__(
+        self,
+        index_root: str = "data/tenants",
+        memory_budget_bytes: int = 1 << 30,
+        embedding_model: str = "text-embedding-3-small",
+        store_factory: Optional[Callable[[str], VectorStore]] = None
+    ):
+        self.index_root = Path(index_root)
+        self.memory_budget_bytes = memory_budget_bytes
+        self.store_factory = store_factory or (
+            lambda index_path: VectorStore(embedding_model=embedding_model, index_path=index_path)
+        )
+        self._paths: Dict[str, str] = {}
+        self._stores: "OrderedDict[str, Tuple[VectorStore, int]]" = OrderedDict()
+        self._resident_bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._stats = {'hits': 0, 'loads': 0, 'evictions': 0}
+
+    def register(self, tenant_id: str, index_path: str) -> None:
+        with self._lock:
+            self._paths[tenant_id] = index_path
+
+    def index_path_for(self, tenant_id: str) -> str:
+        with self._lock:
+            path = self._paths.get(tenant_id)
+        if path is not None:
+            return path
+
+        if not tenant_id or tenant_id in (".", "..") or "/" in tenant_id or "\\" in tenant_id:
+            raise ValueError(f"Invalid tenant id: {tenant_id!r}")
+        return str(self.index_root / tenant_id / "faiss_index")
+
+    def get(self, tenant_id: str) -> VectorStore:
+        with self._lock:
+            store, evicted = self._hit(tenant_id)
+            if store is None:
+                load_lock = self._load_locks.setdefault(tenant_id, threading.Lock())
+        if store is not None:
+            self._release(evicted)
+            return store
+
+        # Loads for different tenants proceed in parallel; concurrent first
+        # queries for the same tenant wait for a single load.
+        with load_lock:
+            with self._lock:
+                store, evicted = self._hit(tenant_id)
+            if store is not None:
+                self._release(evicted)
+                return store
+
+            try:
+                store = self.store_factory(self.index_path_for(tenant_id))
+                store.load()
+                size = self.index_size(store)
+            except BaseException:
+                with self._lock:
+                    self._drop_load_lock(tenant_id, load_lock)
+                raise
+
+            # The store becomes visible and the load lock goes away in one step,
+            # so no other query can start a second load in between.
+            with self._lock:
+                self._drop_load_lock(tenant_id, load_lock)
+                if tenant_id in self._stores:
+                    existing, evicted = self._hit(tenant_id)
+                else:
+                    existing = None
+                    self._stores[tenant_id] = (store, size)
+                    self._resident_bytes += size
+                    self._stats['loads'] += 1
+                    evicted = self._evict_over_budget(keep=tenant_id)
+            self._release(evicted)
+            if existing is not None:
+                # Keep the entry that is already accounted for and drop this copy.
+                store.stop_auto_reload()
+                return existing
+            print(f"✓ Loaded index for tenant {tenant_id} ({size / (1 << 20):.1f} MB)")
+            return store
+
+    def search(self, tenant_id: str, query: str, k: int = 4) -> List[Tuple[Document, float]]:
+        return self.get(tenant_id).search(query, k=k)
+
+    def evict(self, tenant_id: str) -> bool:
+        with self._lock:
+            store = self._evict(tenant_id)
+        if store is None:
+            return False
+        self._release([(tenant_id, store)])
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                'resident': len(self._stores),
+                'resident_bytes': self._resident_bytes,
+                'memory_budget_bytes': self.memory_budget_bytes,
+                'tenants': list(self._stores)
+            }
+
+    @staticmethod
+    def index_size(store: VectorStore) -> int:
+        # Flat FAISS indexes hold ntotal x d float32 values; the raw embeddings
+        # VectorStore keeps for save() cost the same again. Parent section text
+        # and precomputed query vectors are resident per store as well.
+        size = 0
+        if store.index is not None:
+            size += store.index.ntotal * store.index.d * 4
+        if getattr(store, 'embeddings_array', None) is not None:
+            size += store.embeddings_array.nbytes
+        if store.parents is not None:
+            size += sys.getsizeof(store.parents.text) + store.parents.offsets.nbytes
+        size += sum(vector.nbytes for vector in store.query_vectors.values())
+        return size
+
+    def _hit(self, tenant_id: str) -> Tuple[Optional[VectorStore], List[Tuple[str, VectorStore]]]:
+        entry = self._stores.get(tenant_id)
+        if entry is None:
+            return None, []
+
+        # Hot reloads can grow or shrink a store, so re-measure on every hit.
+        store, old_size = entry
+        size = self.index_size(store)
+        self._stores[tenant_id] = (store, size)
+        self._resident_bytes += size - old_size
+        self._stores.move_to_end(tenant_id)
+        self._stats['hits'] += 1
+        return store, self._evict_over_budget(keep=tenant_id)
+
+    def _drop_load_lock(self, tenant_id: str, load_lock: threading.Lock) -> None:
+        # Only in-flight loads keep a lock; later queries hit the cache.
+        if self._load_locks.get(tenant_id) is load_lock:
+            del self._load_locks[tenant_id]
+
+    def _evict_over_budget(self, keep: str) -> List[Tuple[str, VectorStore]]:
+        evicted = []
+        while self._resident_bytes > self.memory_budget_bytes:
+            victim = next((t for t in self._stores if t != keep), None)
+            if victim is None:
+                # A single index larger than the budget still has to be served.
+                break
+            evicted.append((victim, self._evict(victim)))
+        return evicted
+
+    def _evict(self, tenant_id: str) -> Optional[VectorStore]:
+        entry = self._stores.pop(tenant_id, None)
+        if entry is None:
+            return None
+
+        store, size = entry
+        self._resident_bytes -= size
+        self._stats['evictions'] += 1
+        return store
+
+    @staticmethod
+    def _release(evicted: List[Tuple[str, VectorStore]]) -> None:
+        # Called without the manager lock: joining a reload thread that is busy
+        # loading a large snapshot must not stall queries for other tenants.
+        for tenant_id, store in evicted:
+            store.stop_auto_reload()
+            print(f"✓ Evicted index for tenant {tenant_id}")
@@ -1,24 +1,46 @@
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from langchain.document_loaders import PyPDFLoader
+from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from src.hierarchy import ParentStore
+from src.splitting import FastTextSplitter
 
 
 class DocumentIngester:
-    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 50):
+    def __init__(
+        self,
+        chunk_size: int = 500,
+        chunk_overlap: int = 50,
+        fast_splitter: bool = False,
+        parent_chunk_size: Optional[int] = None,
+        token_encoding: Optional[str] = None
+    ):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            separators=["\n\n", "\n", " ", ""]
-        )
+        # With a tiktoken encoding name, chunk sizes count tokens instead of characters.
+        # tiktoken downloads the encoding on first use and caches it locally.
+        self.token_encoding = token_encoding
+        splitter_cls = FastTextSplitter if fast_splitter else RecursiveCharacterTextSplitter
+        self.splitter = self._make_splitter(splitter_cls, chunk_size, chunk_overlap)
+        
+        # Hierarchical mode: index small child chunks, keep their parent sections aside.
+        self.parent_chunk_size = parent_chunk_size
+        self.parents = None
+        self.parent_splitter = None
+        if parent_chunk_size is not None:
+            if parent_chunk_size <= chunk_size:
+                raise ValueError(
+                    f"parent_chunk_size ({parent_chunk_size}) must be larger than chunk_size ({chunk_size})"
+                )
+            self.parents = ParentStore()
+            self.parent_splitter = self._make_splitter(FastTextSplitter, parent_chunk_size, 0)
     
     def ingest_pdf(self, file_path: str) -> List[Dict[str, Any]]:
         loader = PyPDFLoader(file_path)
         docs = loader.load()
         
-        chunks = self.splitter.split_documents(docs)
+        chunks = self._split_documents(docs)
         for i, chunk in enumerate(chunks):
             chunk.metadata['source'] = str(file_path)
             chunk.metadata['chunk_id'] = i
@@ -39,13 +61,35 @@ class DocumentIngester:
         return all_chunks
     
     def ingest_text(self, text: str, source: str = "text_input") -> List[Dict[str, Any]]:
-        from langchain.schema import Document
-        
         doc = Document(page_content=text, metadata={"source": source})
-        chunks = self.splitter.split_documents([doc])
+        chunks = self._split_documents([doc])
         
         for i, chunk in enumerate(chunks):
             chunk.metadata['chunk_id'] = i
             chunk.metadata['chunk_size'] = len(chunk.page_content)
         
         return chunks
+    
+    def _split_documents(self, docs: List[Document]) -> List[Document]:
+        if self.parents is None:
+            return self.splitter.split_documents(docs)
+        
+        chunks = []
+        for doc in docs:
+            text = doc.page_content
+            spans = self.parent_splitter.split_spans(text)
+            parent_ids = self.parents.add(text, spans)
+            for parent_id, (start, end) in zip(parent_ids, spans):
+                section = Document(page_content=text[start:end], metadata=doc.metadata)
+                children = self.splitter.split_documents([section])
+                for child in children:
+                    child.metadata['parent_id'] = parent_id
+                chunks.extend(children)
+        
+        return chunks
+    
+    def _make_splitter(self, splitter_cls, chunk_size: int, chunk_overlap: int):
+        kwargs = dict(chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=["\n\n", "\n", " ", ""])
+        if self.token_encoding is not None:
+            return splitter_cls.from_tiktoken_encoder(encoding_name=self.token_encoding, **kwargs)
+        return splitter_cls(**kwargs)
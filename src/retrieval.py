@@ -1,21 +1,40 @@
 import os
+import threading
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 import faiss
 from langchain.embeddings.openai import OpenAIEmbeddings
 from langchain.schema import Document
+from src.hierarchy import ParentStore
+from src.snapshots import SnapshotStore
 
 
 class VectorStore:
-    def __init__(self, embedding_model: str = "text-embedding-3-small", index_path: str = None):
-        self.embeddings = OpenAIEmbeddings(model=embedding_model)
+    def __init__(
+        self,
+        embedding_model: str = "text-embedding-3-small",
+        index_path: str = None,
+        keep_snapshots: int = 2,
+        embeddings: Any = None
+    ):
+        self.embedding_model = embedding_model
+        self.embeddings = embeddings or OpenAIEmbeddings(model=embedding_model)
         self.index = None
         self.documents = []
+        self.parents = None
         self.index_path = index_path or "data/index/faiss_index"
         self.embeddings_path = index_path.replace(".faiss", "_embeddings.npy") if index_path else "data/index/embeddings.npy"
+        self.snapshots = SnapshotStore(str(Path(self.index_path).with_suffix("")) + "_snapshots", keep=keep_snapshots)
+        self.snapshot_version = None
+        self._swap_lock = threading.Lock()
+        self._reload_stop = None
+        self._reload_thread = None
+        self.query_vectors: Dict[str, np.ndarray] = {}
+        self._warm_k = None
+        self._warm_hits = None
     
-    def add_documents(self, docs: List[Document]) -> None:
+    def add_documents(self, docs: List[Document], parents: ParentStore = None) -> None:
         print(f"Generating embeddings for {len(docs)} chunks...")
         texts = [doc.page_content for doc in docs]
         embeddings = self.embeddings.embed_documents(texts)
@@ -23,74 +42,323 @@ class VectorStore:
         embeddings_array = np.array(embeddings).astype('float32')
         
         dimension = embeddings_array.shape[1]
-        self.index = faiss.IndexFlatL2(dimension)
-        self.index.add(embeddings_array)
+        index = faiss.IndexFlatL2(dimension)
+        index.add(embeddings_array)
         
-        self.documents = docs
-        self.embeddings_array = embeddings_array
+        with self._swap_lock:
+            self.index = index
+            self.documents = docs
+            self.embeddings_array = embeddings_array
+            self.parents = parents
         
         print(f"✓ Index created with {len(docs)} documents")
     
-    def save(self) -> None:
-        Path(self.index_path).parent.mkdir(parents=True, exist_ok=True)
+    def save(self, query_vectors: Optional[Dict[str, np.ndarray]] = None) -> None:
+        staging = self.snapshots.begin()
+        try:
+            faiss.write_index(self.index, str(staging / "index.faiss"))
+            np.save(staging / "embeddings.npy", self.embeddings_array)
+            
+            # Save document metadata as text
+            with open(staging / "metadata.txt", 'w') as f:
+                for i, doc in enumerate(self.documents):
+                    source = doc.metadata.get('source', 'unknown')
+                    chunk_id = doc.metadata.get('chunk_id', i)
+                    f.write(f"{i}|{source}|{chunk_id}\n")
+            
+            if self.parents is not None:
+                self.parents.save(staging)
+                parent_ids = [doc.metadata.get('parent_id', -1) for doc in self.documents]
+                np.save(staging / "parent_ids.npy", np.array(parent_ids, dtype=np.int32))
+            
+            # Precomputed query vectors live in the snapshot, so a fresh ingest
+            # carries the previous snapshot's vectors forward.
+            if query_vectors is None:
+                query_vectors = self.query_vectors or self._current_query_vectors()
+            if query_vectors:
+                self._write_query_vectors(staging / "queries.npz", query_vectors)
+            
+            version = self.snapshots.commit(staging, extra={
+                'num_documents': len(self.documents),
+                'dimension': int(self.index.d)
+            })
+        except BaseException:
+            self.snapshots.abort(staging)
+            raise
         
-        faiss.write_index(self.index, self.index_path)
-        np.save(self.embeddings_path, self.embeddings_array)
+        self.snapshot_version = version
+        self.query_vectors = query_vectors
+        print(f"✓ Index snapshot {version} saved to {self.snapshots.root}")
+    
+    def load(self) -> None:
+        version = self.snapshots.current_version()
+        if version is None:
+            self._load_legacy()
+        else:
+            self._load_snapshot(version)
+            print(f"✓ Index snapshot {version} loaded from {self.snapshots.root}")
+    
+    def reload(self) -> bool:
+        version = self.snapshots.current_version()
+        if version is None or version == self.snapshot_version:
+            return False
         
-        # Save document metadata as text
-        metadata_path = self.index_path.replace(".faiss", "_metadata.txt")
-        with open(metadata_path, 'w') as f:
-            for i, doc in enumerate(self.documents):
-                source = doc.metadata.get('source', 'unknown')
-                chunk_id = doc.metadata.get('chunk_id', i)
-                f.write(f"{i}|{source}|{chunk_id}\n")
+        self._load_snapshot(version)
+        if self._warm_k is not None:
+            self.warm_up(self._warm_k)
+        print(f"✓ Hot-reloaded index snapshot {version}")
+        return True
+    
+    def start_auto_reload(self, interval: float = 5.0) -> None:
+        if self._reload_thread is not None:
+            return
         
-        print(f"✓ Index saved to {self.index_path}")
+        self._reload_stop = threading.Event()
+        
+        def poll():
+            while not self._reload_stop.wait(interval):
+                try:
+                    self.reload()
+                except Exception as e:
+                    # Keep serving the current snapshot; the next poll retries.
+                    print(f"❌ Index reload failed: {e}")
+        
+        self._reload_thread = threading.Thread(target=poll, name="vector-store-reload", daemon=True)
+        self._reload_thread.start()
     
-    def load(self) -> None:
+    def stop_auto_reload(self) -> None:
+        if self._reload_thread is None:
+            return
+        
+        self._reload_stop.set()
+        self._reload_thread.join()
+        self._reload_thread = None
+        self._reload_stop = None
+    
+    def _load_snapshot(self, version: str) -> None:
+        self.snapshots.verify(version)
+        snapshot_dir = self.snapshots.path_for(version)
+        
+        index = faiss.read_index(str(snapshot_dir / "index.faiss"))
+        embeddings_array = np.load(snapshot_dir / "embeddings.npy")
+        documents = self._read_metadata(snapshot_dir / "metadata.txt")
+        
+        query_vectors = self._read_query_vectors(snapshot_dir / "queries.npz", index.d)
+        
+        parents = None
+        if ParentStore.exists(snapshot_dir):
+            parents = ParentStore.load(snapshot_dir)
+            parent_ids = np.load(snapshot_dir / "parent_ids.npy")
+            for doc, parent_id in zip(documents, parent_ids.tolist()):
+                if parent_id >= 0:
+                    doc.metadata['parent_id'] = parent_id
+        
+        # Searches grab their references under the same lock, so in-flight ones
+        # finish on the old snapshot while new ones see the new one.
+        with self._swap_lock:
+            self.index = index
+            self.embeddings_array = embeddings_array
+            self.documents = documents
+            self.parents = parents
+            self.query_vectors = query_vectors
+            self.snapshot_version = version
+    
+    def _load_legacy(self) -> None:
         if not Path(self.index_path).exists():
             raise FileNotFoundError(f"Index not found at {self.index_path}")
         
-        self.index = faiss.read_index(self.index_path)
-        self.embeddings_array = np.load(self.embeddings_path)
+        index = faiss.read_index(self.index_path)
+        embeddings_array = np.load(self.embeddings_path)
+        documents = self._read_metadata(Path(self.index_path.replace(".faiss", "_metadata.txt")))
         
-        metadata_path = self.index_path.replace(".faiss", "_metadata.txt")
-        self.documents = []
-        if Path(metadata_path).exists():
+        with self._swap_lock:
+            self.index = index
+            self.embeddings_array = embeddings_array
+            self.documents = documents
+            self.parents = None
+            self.query_vectors = {}
+        
+        print(f"✓ Index loaded from {self.index_path}")
+    
+    @staticmethod
+    def _read_metadata(metadata_path: Path) -> List[Document]:
+        documents = []
+        if metadata_path.exists():
             with open(metadata_path, 'r') as f:
                 for line in f:
                     idx, source, chunk_id = line.strip().split('|')
-                    self.documents.append(Document(
+                    documents.append(Document(
                         page_content="",
                         metadata={'source': source, 'chunk_id': int(chunk_id)}
                     ))
+        return documents
+    
+    def precompute_queries(self, queries: List[str]) -> int:
+        if self.index is None:
+            raise RuntimeError("Index not initialized. Call add_documents() or load() first.")
         
-        print(f"✓ Index loaded from {self.index_path}")
+        queries = list(dict.fromkeys(q for q in queries if q.strip()))
+        if not queries:
+            return 0
+        
+        # One batched request instead of an embed_query round trip per query;
+        # OpenAI returns the same vector either way.
+        print(f"Precomputing embeddings for {len(queries)} queries...")
+        vectors = np.array(self.embeddings.embed_documents(queries)).astype('float32')
+        
+        query_vectors = dict(self.query_vectors)
+        query_vectors.update(zip(queries, vectors))
+        
+        # Written as a new snapshot so the vectors are promoted atomically with
+        # the index they were checked against; save() only adopts them once the
+        # snapshot is committed.
+        self.save(query_vectors)
+        return len(queries)
+    
+    def _current_query_vectors(self) -> Dict[str, np.ndarray]:
+        version = self.snapshots.current_version()
+        if version is None or self.index is None:
+            return {}
+        return self._read_query_vectors(self.snapshots.path_for(version) / "queries.npz", self.index.d)
+    
+    def _write_query_vectors(self, path: Path, query_vectors: Dict[str, np.ndarray]) -> None:
+        queries = list(query_vectors)
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                queries=np.array(queries, dtype=str),
+                vectors=np.array([query_vectors[q] for q in queries], dtype='float32'),
+                model=np.array(self.embedding_model)
+            )
+    
+    def _read_query_vectors(self, path: Path, dimension: int) -> Dict[str, np.ndarray]:
+        if not path.exists():
+            return {}
+        
+        with np.load(path, allow_pickle=False) as data:
+            model = str(data['model'])
+            queries = data['queries'].tolist()
+            vectors = data['vectors']
+        
+        if model != self.embedding_model:
+            print(f"❌ Ignoring query embeddings from {model}; index uses {self.embedding_model}")
+            return {}
+        if len(queries) and vectors.shape[1] != dimension:
+            print(f"❌ Ignoring query embeddings of dimension {vectors.shape[1]}; index has {dimension}")
+            return {}
+        
+        return dict(zip(queries, vectors))
+    
+    def warm_up(self, k: int = 4) -> int:
+        with self._swap_lock:
+            index, documents = self.index, self.documents
+        
+        if index is None:
+            raise RuntimeError("Index not initialized. Call add_documents() or load() first.")
+        
+        self._warm_k = k
+        query_vectors = self.query_vectors
+        if not query_vectors:
+            self._warm_hits = None
+            return 0
+        
+        queries = list(query_vectors)
+        query_array = np.array([query_vectors[q] for q in queries], dtype='float32')
+        hits = dict(zip(queries, self._search_index(index, documents, query_array, k)))
+        
+        # Tied to the index object so a swapped-in snapshot never serves stale hits.
+        self._warm_hits = (index, k, hits)
+        print(f"✓ Warmed up {len(queries)} queries (k={k})")
+        return len(queries)
     
     def search(self, query: str, k: int = 4) -> List[Tuple[Document, float]]:
-        if self.index is None:
+        with self._swap_lock:
+            index, documents = self.index, self.documents
+        
+        if index is None:
             raise RuntimeError("Index not initialized. Call add_documents() or load() first.")
         
-        query_embedding = self.embeddings.embed_query(query)
-        query_array = np.array([query_embedding]).astype('float32')
+        return self._search_query(index, documents, query, k)
+    
+    def search_parents(self, query: str, k: int = 4, fetch_factor: int = 4) -> List[Tuple[str, Document, float]]:
+        with self._swap_lock:
+            index, documents, parents = self.index, self.documents, self.parents
         
-        distances, indices = self.index.search(query_array, k)
+        if index is None:
+            raise RuntimeError("Index not initialized. Call add_documents() or load() first.")
+        if parents is None:
+            raise RuntimeError("Index has no parent sections. Ingest with parent_chunk_size set.")
         
+        # Several children usually share a parent, so over-fetch to fill k sections.
         results = []
-        for idx, distance in zip(indices[0], distances[0]):
-            if idx >= 0 and idx < len(self.documents):
-                doc = self.documents[idx]
-                score = float(1 / (1 + distance))  # Convert distance to similarity
-                results.append((doc, score))
+        seen = set()
+        for doc, score in self._search_query(index, documents, query, k * fetch_factor):
+            parent_id = doc.metadata.get('parent_id')
+            if parent_id is None or parent_id in seen:
+                continue
+            seen.add(parent_id)
+            results.append((parents.get(parent_id), doc, score))
+            if len(results) == k:
+                break
         
         return results
+    
+    def _search_query(self, index, documents: List[Document], query: str, k: int) -> List[Tuple[Document, float]]:
+        warm_hits = self._warm_hits
+        if warm_hits is not None and warm_hits[0] is index and k <= warm_hits[1] and query in warm_hits[2]:
+            return warm_hits[2][query][:k]
+        
+        query_embedding = self.query_vectors.get(query)
+        if query_embedding is None:
+            query_embedding = self.embeddings.embed_query(query)
+        query_array = np.array([query_embedding]).astype('float32')
+        
+        return self._search_index(index, documents, query_array, k)[0]
+    
+    def search_by_vector(self, vector: Any, k: int = 4) -> List[Tuple[Document, float]]:
+        with self._swap_lock:
+            index, documents = self.index, self.documents
+        
+        if index is None:
+            raise RuntimeError("Index not initialized. Call add_documents() or load() first.")
+        
+        query_array = np.array(vector, dtype='float32').reshape(1, -1)
+        return self._search_index(index, documents, query_array, k)[0]
+    
+    @staticmethod
+    def _search_index(index, documents: List[Document], query_array: np.ndarray, k: int) -> List[List[Tuple[Document, float]]]:
+        distances, indices = index.search(query_array, k)
+        
+        batch_results = []
+        for row_indices, row_distances in zip(indices, distances):
+            results = []
+            for idx, distance in zip(row_indices, row_distances):
+                if idx >= 0 and idx < len(documents):
+                    doc = documents[idx]
+                    score = float(1 / (1 + distance))  # Convert distance to similarity
+                    results.append((doc, score))
+            batch_results.append(results)
+        
+        return batch_results
 
 
 class Retriever:
-    def __init__(self, vector_store: VectorStore):
+    def __init__(self, vector_store: VectorStore, expand_parents: bool = False):
         self.vector_store = vector_store
+        self.expand_parents = expand_parents
     
     def retrieve(self, query: str, k: int = 4) -> List[Dict[str, Any]]:
+        if self.expand_parents:
+            return [
+                {
+                    'content': parent_text,
+                    'source': doc.metadata.get('source', 'unknown'),
+                    'score': score,
+                    'parent_id': doc.metadata['parent_id']
+                }
+                for parent_text, doc, score in self.vector_store.search_parents(query, k=k)
+            ]
+        
         results = self.vector_store.search(query, k=k)
         
         return [
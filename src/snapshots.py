@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+
+MANIFEST_NAME = "manifest.json"
+POINTER_NAME = "CURRENT"
+TMP_PREFIX = ".tmp-"
+
+
+class SnapshotStore:
+    def __init__(self, root: str, keep: int = 2, grace_period: float = 60.0, staging_timeout: float = 3600.0):
+        self.root = Path(root)
+        self.keep = max(1, keep)
+        # Superseded snapshots outlive the retention count for grace_period
+        # seconds so readers that just followed the old pointer can finish
+        # loading; staging dirs older than staging_timeout belong to dead writers.
+        self.grace_period = grace_period
+        self.staging_timeout = staging_timeout
+
+    @property
+    def pointer_path(self) -> Path:
+        return self.root / POINTER_NAME
+
+    def begin(self) -> Path:
+        self.root.mkdir(parents=True, exist_ok=True)
+        version = self._new_version()
+        staging = self.root / f"{TMP_PREFIX}{version}"
+        staging.mkdir()
+        return staging
+
+    def commit(self, staging: Path, extra: Optional[Dict[str, Any]] = None) -> str:
+        version = staging.name[len(TMP_PREFIX):]
+        files = {}
+        for path in sorted(staging.iterdir()):
+            if path.is_file() and path.name != MANIFEST_NAME:
+                _fsync_file(path)
+                files[path.name] = _sha256(path)
+        manifest = {
+            'version': version,
+            'created_at': time.time(),
+            'files': files,
+            **(extra or {})
+        }
+        _write_atomic(staging / MANIFEST_NAME, json.dumps(manifest, indent=2))
+
+        final = self.root / version
+        os.replace(staging, final)
+        _fsync_dir(self.root)
+
+        # Readers only ever follow the pointer, so swapping it is the promotion.
+        _write_atomic(self.pointer_path, version)
+        self.collect_garbage()
+        return version
+
+    def abort(self, staging: Path) -> None:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    def current_version(self) -> Optional[str]:
+        try:
+            version = self.pointer_path.read_text().strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def path_for(self, version: str) -> Path:
+        return self.root / version
+
+    def verify(self, version: str) -> Dict[str, Any]:
+        snapshot_dir = self.path_for(version)
+        manifest_path = snapshot_dir / MANIFEST_NAME
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"Snapshot manifest not found at {manifest_path}")
+
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+
+        for name, expected in manifest['files'].items():
+            actual = _sha256(snapshot_dir / name)
+            if actual != expected:
+                raise ValueError(f"Checksum mismatch for {name} in snapshot {version}")
+
+        return manifest
+
+    def list_versions(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(
+            p.name for p in self.root.iterdir()
+            if p.is_dir() and not p.name.startswith(TMP_PREFIX)
+        )
+
+    def collect_garbage(self) -> List[str]:
+        current = self.current_version()
+        all_versions = self.list_versions()
+        versions = [v for v in all_versions if v != current]
+        # The current snapshot always counts towards the retention budget.
+        stale = versions[:max(0, len(versions) - (self.keep - 1))]
+        now = time.time()
+        removed = []
+        for version in stale:
+            if now - self._superseded_at(version, all_versions) < self.grace_period:
+                continue
+            shutil.rmtree(self.path_for(version), ignore_errors=True)
+            removed.append(version)
+
+        for path in self.root.iterdir():
+            if not path.name.startswith(TMP_PREFIX):
+                continue
+            try:
+                age = now - path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if age < self.staging_timeout:
+                continue
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+        return removed
+
+    def _superseded_at(self, version: str, versions: List[str]) -> float:
+        # A snapshot stops being served once the next one is promoted, which
+        # happens right after that one's manifest is written.
+        later = [v for v in versions if v > version]
+        if not later:
+            return time.time()
+        try:
+            with open(self.path_for(later[0]) / MANIFEST_NAME, 'r') as f:
+                return json.load(f)['created_at']
+        except (OSError, ValueError, KeyError):
+            return time.time()
+
+    def _new_version(self) -> str:
+        version = f"{time.time_ns():020d}"
+        while (self.root / version).exists() or (self.root / f"{TMP_PREFIX}{version}").exists():
+            version = f"{int(version) + 1:020d}"
+        return version
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _fsync_file(path: Path) -> None:
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+
+def _write_atomic(path: Path, content: str) -> None:
+    # A unique temp name keeps concurrent writers from replacing each other's file.
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{TMP_PREFIX}{path.name}-", dir=path.parent)
+    with os.fdopen(fd, 'w') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _fsync_dir(path: Path) -> None:
+    # Directory fsync is not supported on Windows; the rename is still atomic there.
+    if os.name == 'nt':
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,227 @@
+import copy
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from langchain.schema import Document
+
+
+Span = Tuple[int, int]
+
+
+class FastTextSplitter:
+    """Drop-in alternative to RecursiveCharacterTextSplitter(keep_separator=True).
+
+    Chunks are produced as (start, end) offsets into the source text, so the
+    recursive splitting and merging never copies substrings; text is only sliced
+    once per emitted chunk. Each separator is located with one vectorized scan
+    over the whole text and looked up by binary search for every sub-span.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 4000,
+        chunk_overlap: int = 200,
+        separators: Optional[List[str]] = None,
+        length_function: Optional[Callable[[str], int]] = None,
+        add_start_index: bool = False,
+        strip_whitespace: bool = True,
+    ):
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Got a larger chunk overlap ({chunk_overlap}) than chunk size "
+                f"({chunk_size}), should be smaller."
+            )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = separators or ["\n\n", "\n", " ", ""]
+        self.length_function = length_function
+        self.add_start_index = add_start_index
+        self.strip_whitespace = strip_whitespace
+
+    @classmethod
+    def from_tiktoken_encoder(cls, encoding_name: str = "cl100k_base", **kwargs) -> "FastTextSplitter":
+        try:
+            import tiktoken
+        except ImportError:
+            raise ImportError(
+                "Could not import tiktoken python package. "
+                "Please install it with `pip install tiktoken`."
+            )
+
+        encoding = tiktoken.get_encoding(encoding_name)
+
+        def token_length(text: str) -> int:
+            return len(encoding.encode_ordinary(text))
+
+        return cls(length_function=token_length, **kwargs)
+
+    def split_spans(self, text: str) -> List[Span]:
+        return self._split(text, 0, len(text), self.separators, _SeparatorIndex(text))
+
+    def split_text(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self.split_spans(text)]
+
+    def split_documents(self, documents: Iterable[Document]) -> List[Document]:
+        chunks = []
+        for doc in documents:
+            text = doc.page_content
+            for start, end in self.split_spans(text):
+                metadata = copy.deepcopy(doc.metadata)
+                if self.add_start_index:
+                    metadata['start_index'] = start
+                chunks.append(Document(page_content=text[start:end], metadata=metadata))
+        return chunks
+
+    def _length(self, text: str, start: int, end: int) -> int:
+        if self.length_function is None:
+            return end - start
+        return self.length_function(text[start:end])
+
+    def _split(
+        self, text: str, start: int, end: int, separators: List[str], index: "_SeparatorIndex"
+    ) -> List[Span]:
+        separator = separators[-1]
+        new_separators: List[str] = []
+        for i, candidate in enumerate(separators):
+            if candidate == "":
+                separator = candidate
+                break
+            if index.contains(start, end, candidate):
+                separator = candidate
+                new_separators = separators[i + 1:]
+                break
+
+        if not separator:
+            return self._split_chars(text, start, end)
+        cuts = index.find(start, end, separator)
+
+        final_chunks: List[Span] = []
+        good: List[Tuple[int, int, int]] = []
+        piece_start = start
+        for cut in cuts + [end]:
+            # Keep-separator semantics: each separator starts the following piece.
+            if cut == piece_start:
+                continue
+            piece_end = cut
+            length = self._length(text, piece_start, piece_end)
+            if length < self.chunk_size:
+                good.append((piece_start, piece_end, length))
+            else:
+                if good:
+                    final_chunks.extend(self._merge(text, good))
+                    good = []
+                if not new_separators:
+                    final_chunks.append((piece_start, piece_end))
+                else:
+                    final_chunks.extend(self._split(text, piece_start, piece_end, new_separators, index))
+            piece_start = cut
+        if good:
+            final_chunks.extend(self._merge(text, good))
+        return final_chunks
+
+    def _split_chars(self, text: str, start: int, end: int) -> List[Span]:
+        if self.length_function is not None or self.chunk_size <= 1:
+            chunks: List[Span] = []
+            good: List[Tuple[int, int, int]] = []
+            for i in range(start, end):
+                length = self._length(text, i, i + 1)
+                if length < self.chunk_size:
+                    good.append((i, i + 1, length))
+                    continue
+                if good:
+                    chunks.extend(self._merge(text, good))
+                    good = []
+                chunks.append((i, i + 1))
+            if good:
+                chunks.extend(self._merge(text, good))
+            return chunks
+
+        # With character lengths every piece is one unit long, so _merge reduces
+        # to fixed windows that overlap by whatever the pop loop leaves behind.
+        step = self.chunk_size - min(self.chunk_overlap, self.chunk_size - 1)
+        chunks = []
+        window_start = start
+        while window_start + self.chunk_size < end:
+            span = self._join(text, window_start, window_start + self.chunk_size)
+            if span is not None:
+                chunks.append(span)
+            window_start += step
+        span = self._join(text, window_start, end)
+        if span is not None:
+            chunks.append(span)
+        return chunks
+
+    def _merge(self, text: str, pieces: List[Tuple[int, int, int]]) -> List[Span]:
+        chunks: List[Span] = []
+        window_start = 0
+        total = 0
+        for i, (_, _, length) in enumerate(pieces):
+            if total + length > self.chunk_size:
+                if i > window_start:
+                    span = self._join(text, pieces[window_start][0], pieces[i - 1][1])
+                    if span is not None:
+                        chunks.append(span)
+                    while total > self.chunk_overlap or (total + length > self.chunk_size and total > 0):
+                        total -= pieces[window_start][2]
+                        window_start += 1
+            total += length
+        span = self._join(text, pieces[window_start][0], pieces[-1][1])
+        if span is not None:
+            chunks.append(span)
+        return chunks
+
+    def _join(self, text: str, start: int, end: int) -> Optional[Span]:
+        if self.strip_whitespace:
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+        if start == end:
+            return None
+        return start, end
+
+
+class _SeparatorIndex:
+    def __init__(self, text: str):
+        self.text = text
+        self._codepoints = None
+        self._positions: Dict[str, np.ndarray] = {}
+
+    def contains(self, start: int, end: int, separator: str) -> bool:
+        if _self_overlapping(separator):
+            return self.text.find(separator, start, end) != -1
+        lo, hi = self._bounds(start, end, separator)
+        return hi > lo
+
+    def find(self, start: int, end: int, separator: str) -> List[int]:
+        if _self_overlapping(separator):
+            # Overlapping matches depend on where the scan starts, so rescan the span.
+            pattern = re.compile(re.escape(separator))
+            return [m.start() for m in pattern.finditer(self.text, start, end)]
+
+        lo, hi = self._bounds(start, end, separator)
+        return self._positions[separator][lo:hi].tolist()
+
+    def _bounds(self, start: int, end: int, separator: str) -> Tuple[int, int]:
+        positions = self._positions.get(separator)
+        if positions is None:
+            positions = self._positions[separator] = self._scan(separator)
+        lo, hi = np.searchsorted(positions, [start, end - len(separator) + 1])
+        return int(lo), int(hi)
+
+    def _scan(self, separator: str) -> np.ndarray:
+        if self._codepoints is None:
+            self._codepoints = np.frombuffer(self.text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        codepoints = self._codepoints
+        width = len(separator)
+        if width > len(codepoints):
+            return np.empty(0, dtype=np.int64)
+
+        matches = np.ones(len(codepoints) - width + 1, dtype=bool)
+        for offset, char in enumerate(separator):
+            matches &= codepoints[offset:len(codepoints) - width + 1 + offset] == ord(char)
+        return np.flatnonzero(matches)
+
+
+def _self_overlapping(separator: str) -> bool:
+    return any(separator[:i] == separator[-i:] for i in range(1, len(separator)))
@@ -0,0 +1,45 @@
+import pytest
+from langchain.schema import Document
+from src.retrieval import VectorStore
+
+
+class FakeEmbeddings:
+    """Length-based embeddings: a text of n characters maps to [n, 1, 0, ...]."""
+
+    def __init__(self, dimension: int = 3):
+        self.dimension = dimension
+        self.query_calls = 0
+        self.document_calls = 0
+
+    def embed_documents(self, texts):
+        self.document_calls += 1
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return self._embed(text)
+
+    def _embed(self, text):
+        return [float(len(text)), 1.0] + [0.0] * (self.dimension - 2)
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    return str(tmp_path / "test_index.faiss")
+
+
+@pytest.fixture
+def make_store():
+    def factory(index_path, embeddings=None, **kwargs):
+        return VectorStore(index_path=index_path, embeddings=embeddings or FakeEmbeddings(), **kwargs)
+    return factory
+
+
+@pytest.fixture
+def make_docs():
+    def factory(n, source='doc.pdf'):
+        return [
+            Document(page_content="x" * (i + 1), metadata={'source': source, 'chunk_id': i})
+            for i in range(n)
+        ]
+    return factory
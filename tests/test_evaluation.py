@@ -0,0 +1,143 @@
+import json
+import pytest
+import tempfile
+from pathlib import Path
+from unittest.mock import Mock
+from src.evaluation import (
+    HashingEmbeddings, evaluate, load_labels,
+    _rank_relevance, _recall_at_k, _reciprocal_rank, _ndcg_at_k
+)
+from langchain.schema import AIMessage
+from src.generation import AnswerGenerator
+from src.ingestion import DocumentIngester
+from src.retrieval import VectorStore, Retriever
+
+
+CORPUS = {
+    'ml.txt': "Machine learning trains models on data. Supervised learning uses labels. " * 10,
+    'db.txt': "Databases store rows in tables. Indexes speed up SQL queries on tables. " * 10,
+    'cooking.txt': "Bake bread with flour, water, yeast and salt. Knead the dough well. " * 10,
+}
+
+EXAMPLES = [
+    {'query': "supervised machine learning models", 'relevant': ['ml.txt']},
+    {'query': "SQL indexes on database tables", 'relevant': ['db.txt']},
+    {'query': "knead bread dough with yeast", 'relevant': ['cooking.txt']},
+]
+
+
+@pytest.fixture
+def retriever(tmp_path):
+    ingester = DocumentIngester(chunk_size=200, chunk_overlap=20)
+    chunks = []
+    for name, text in CORPUS.items():
+        chunks.extend(ingester.ingest_text(text, source=f"data/documents/{name}"))
+
+    store = VectorStore(index_path=str(tmp_path / "index.faiss"), embeddings=HashingEmbeddings())
+    store.add_documents(chunks)
+    return Retriever(store)
+
+
+def test_hashing_embeddings_are_deterministic_and_normalised():
+    embeddings = HashingEmbeddings(dimension=64)
+    first = embeddings.embed_query("Machine learning")
+
+    assert first == HashingEmbeddings(dimension=64).embed_query("machine  LEARNING")
+    assert len(first) == 64
+    assert sum(v * v for v in first) == pytest.approx(1.0)
+    assert embeddings.embed_documents(["Machine learning"]) == [first]
+
+
+def test_ranking_metrics():
+    retrieved = [{'source': 'x.pdf'}, {'source': 'data/a.pdf'}, {'source': 'data/a.pdf'}, {'source': 'b.pdf'}]
+    ranking = _rank_relevance(retrieved, ['a.pdf', 'b.pdf'])
+
+    assert ranking == [None, 'a.pdf', None, 'b.pdf']
+    assert _recall_at_k(ranking, 2, 1) == 0.0
+    assert _recall_at_k(ranking, 2, 3) == 0.5
+    assert _recall_at_k(ranking, 2, 4) == 1.0
+    assert _reciprocal_rank(ranking) == 0.5
+    assert _ndcg_at_k(ranking, 2, 4) == pytest.approx((1 / 1.5849625 + 1 / 2.3219281) / (1 + 1 / 1.5849625), rel=1e-6)
+    assert _reciprocal_rank([None, None]) == 0.0
+
+
+def test_metrics_at_k_ignore_chunks_below_k():
+    chunks = [{'source': s} for s in ['a.pdf', 'a.pdf', 'a.pdf', 'b.pdf', 'c.pdf']]
+    retriever = Mock()
+    retriever.retrieve.side_effect = lambda query, k: chunks[:k]
+    examples = [{'query': "q", 'relevant': ['b.pdf']}]
+
+    alone = evaluate(retriever, examples, ks=(3,))
+    combined = evaluate(retriever, examples, ks=(3, 5))
+
+    assert alone['recall@3'] == combined['recall@3'] == 0.0
+    assert alone['ndcg@3'] == combined['ndcg@3'] == 0.0
+    assert combined['recall@5'] == 1.0
+    assert combined['mrr@5'] == 0.25
+
+
+def test_evaluate_reports_quality_latency_and_calls(retriever):
+    report = evaluate(retriever, EXAMPLES, ks=(1, 3))
+
+    assert report['num_queries'] == 3
+    assert report['recall@1'] == 1.0
+    assert report['mrr@3'] == 1.0
+    assert report['ndcg@3'] == 1.0
+    assert report['embedding_calls'] == {'embed_query': 3, 'embed_documents': 0}
+    assert 'llm_calls' not in report
+    assert set(report['retrieval_latency_ms']) == {'mean', 'p50', 'p90', 'p95', 'p99'}
+    assert isinstance(retriever.vector_store.embeddings, HashingEmbeddings)
+
+
+def test_evaluate_counts_llm_calls_through_pipeline(retriever, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    generator = AnswerGenerator()
+    llm = Mock(return_value=AIMessage(content="answer"))
+    generator.llm = llm
+
+    report = evaluate(retriever, EXAMPLES, ks=(2,), generator=generator)
+
+    assert report['llm_calls'] == 3
+    assert llm.call_count == 3
+    assert report['recall@2'] == 1.0
+    assert len(report['answer_latency_ms']) == 5
+    assert generator.llm is llm
+
+
+def test_evaluate_skips_embedding_for_precomputed_queries(retriever):
+    retriever.vector_store.precompute_queries([e['query'] for e in EXAMPLES])
+
+    report = evaluate(retriever, EXAMPLES)
+
+    assert report['embedding_calls']['embed_query'] == 0
+
+
+def test_load_labels_validates_lines():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        good = Path(tmpdir) / "labels.jsonl"
+        good.write_text(json.dumps(EXAMPLES[0]) + "\n\n" + json.dumps(EXAMPLES[1]) + "\n")
+        assert load_labels(str(good)) == EXAMPLES[:2]
+
+        bad = Path(tmpdir) / "bad.jsonl"
+        bad.write_text(json.dumps({'query': "no labels", 'relevant': []}) + "\n")
+        with pytest.raises(ValueError):
+            load_labels(str(bad))
+
+
+def test_evaluate_command_offline(capsys):
+    from src.cli import evaluate_command
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        docs_dir = Path(tmpdir) / "documents"
+        docs_dir.mkdir()
+        for name, text in CORPUS.items():
+            (docs_dir / name).write_text(text)
+        labels = Path(tmpdir) / "labels.jsonl"
+        labels.write_text("\n".join(json.dumps(e) for e in EXAMPLES))
+
+        evaluate_command(str(labels), k=3, offline_dir=str(docs_dir))
+
+    output = capsys.readouterr().out
+    report = json.loads(output[output.index("{"):])
+    assert report['recall@3'] == 1.0
+    assert report['embedding_calls']['embed_query'] == 3
@@ -0,0 +1,105 @@
+import pytest
+import tempfile
+from pathlib import Path
+from src.hierarchy import ParentStore
+from src.ingestion import DocumentIngester
+from src.retrieval import Retriever
+
+
+class KeywordEmbeddings:
+    KEYWORDS = ["alpha", "beta", "gamma", "delta"]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text):
+        counts = [float(text.count(word)) for word in self.KEYWORDS]
+        norm = sum(c * c for c in counts) ** 0.5 or 1.0
+        return [c / norm for c in counts]
+
+
+SECTIONS = [
+    "alpha " * 60,
+    "beta " * 60,
+    "gamma " * 60,
+]
+
+
+@pytest.fixture
+def hierarchical_ingester():
+    return DocumentIngester(chunk_size=100, chunk_overlap=10, parent_chunk_size=400)
+
+
+@pytest.fixture
+def hierarchical_store(index_path, make_store, hierarchical_ingester):
+    chunks = hierarchical_ingester.ingest_text("\n\n".join(SECTIONS), source="doc.txt")
+    store = make_store(index_path, embeddings=KeywordEmbeddings())
+    store.add_documents(chunks, parents=hierarchical_ingester.parents)
+    return store
+
+
+def test_parent_store_offsets():
+    parents = ParentStore()
+    assert parents.add("hello world", [(0, 5), (6, 11)]) == [0, 1]
+    assert parents.add("second doc", [(0, 10)]) == [2]
+
+    assert len(parents) == 3
+    assert [parents.get(i) for i in range(3)] == ["hello", "world", "second doc"]
+    assert parents.offsets.shape == (3, 2)
+
+
+def test_parent_store_round_trip_keeps_line_endings():
+    parents = ParentStore()
+    parents.add("line one\r\nline two\r\n", [(0, 10), (10, 20)])
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        parents.save(Path(tmpdir))
+        loaded = ParentStore.load(Path(tmpdir))
+
+    assert [loaded.get(i) for i in range(2)] == ["line one\r\n", "line two\r\n"]
+
+
+def test_children_reference_parents(hierarchical_ingester):
+    chunks = hierarchical_ingester.ingest_text("\n\n".join(SECTIONS), source="doc.txt")
+    parents = hierarchical_ingester.parents
+
+    assert len(parents) == len(SECTIONS)
+    assert all(len(c.page_content) <= 100 for c in chunks)
+    assert [c.metadata['chunk_id'] for c in chunks] == list(range(len(chunks)))
+    for chunk in chunks:
+        assert chunk.page_content in parents.get(chunk.metadata['parent_id'])
+
+
+def test_parent_chunk_size_must_exceed_chunk_size():
+    with pytest.raises(ValueError):
+        DocumentIngester(chunk_size=500, parent_chunk_size=500)
+
+
+def test_retrieve_expands_to_parent_sections(hierarchical_store):
+    retriever = Retriever(hierarchical_store, expand_parents=True)
+
+    results = retriever.retrieve("beta", k=2)
+
+    assert len(results) == 2
+    assert results[0]['content'] == SECTIONS[1].strip()
+    assert len({r['parent_id'] for r in results}) == 2
+    assert all(r['source'] == 'doc.txt' for r in results)
+
+
+def test_parents_survive_save_and_load(hierarchical_store, index_path, make_store):
+    hierarchical_store.save()
+
+    reader = make_store(index_path, embeddings=KeywordEmbeddings())
+    reader.load()
+
+    results = reader.search_parents("gamma", k=1)
+    assert results[0][0] == SECTIONS[2].strip()
+
+
+def test_search_parents_requires_hierarchical_index(index_path, make_store):
+    chunks = DocumentIngester(chunk_size=100, chunk_overlap=10).ingest_text(" ".join(SECTIONS))
+    store = make_store(index_path, embeddings=KeywordEmbeddings())
+    store.add_documents(chunks)
+
+    with pytest.raises(RuntimeError):
+        store.search_parents("alpha")
@@ -0,0 +1,194 @@
+import pytest
+import threading
+from pathlib import Path
+from tests.conftest import FakeEmbeddings
+from src.index_manager import IndexManager
+
+
+@pytest.fixture
+def tenant_store(make_store):
+    def factory(index_path):
+        return make_store(index_path, embeddings=FakeEmbeddings(dimension=4))
+    return factory
+
+
+@pytest.fixture
+def index_root(tmp_path, tenant_store, make_docs):
+    for tenant, n in [("acme", 10), ("globex", 20), ("initech", 30)]:
+        store = tenant_store(str(tmp_path / tenant / "faiss_index"))
+        store.add_documents(make_docs(n, source=f'{tenant}.pdf'))
+        store.save()
+    return str(tmp_path)
+
+
+# Each document costs 4 dims x 4 bytes in the index plus the same again in embeddings_array.
+BYTES_PER_DOC = 32
+
+
+def test_lazy_load_on_first_query(index_root, tenant_store):
+    manager = IndexManager(index_root, store_factory=tenant_store)
+    assert manager.stats()['resident'] == 0
+
+    results = manager.search("acme", "xxx", k=1)
+
+    assert results[0][0].metadata['source'] == 'acme.pdf'
+    assert manager.stats()['loads'] == 1
+    assert manager.stats()['resident_bytes'] == 10 * BYTES_PER_DOC
+
+
+def test_repeated_queries_hit_cache(index_root, tenant_store):
+    manager = IndexManager(index_root, store_factory=tenant_store)
+
+    first = manager.get("acme")
+    assert manager.get("acme") is first
+
+    stats = manager.stats()
+    assert stats['loads'] == 1
+    assert stats['hits'] == 1
+
+
+def test_lru_eviction_respects_budget(index_root, tenant_store):
+    manager = IndexManager(index_root, memory_budget_bytes=40 * BYTES_PER_DOC, store_factory=tenant_store)
+
+    manager.get("acme")
+    manager.get("globex")
+    manager.get("acme")
+    manager.get("initech")
+
+    stats = manager.stats()
+    assert stats['tenants'] == ["acme", "initech"]
+    assert stats['evictions'] == 1
+    assert stats['resident_bytes'] <= stats['memory_budget_bytes']
+
+
+def test_oversized_index_is_still_served(index_root, tenant_store):
+    manager = IndexManager(index_root, memory_budget_bytes=5 * BYTES_PER_DOC, store_factory=tenant_store)
+
+    manager.get("acme")
+    manager.get("globex")
+
+    assert manager.stats()['tenants'] == ["globex"]
+
+
+def test_explicit_evict(index_root, tenant_store):
+    manager = IndexManager(index_root, store_factory=tenant_store)
+    manager.get("acme")
+
+    assert manager.evict("acme") is True
+    assert manager.evict("acme") is False
+    assert manager.stats()['resident_bytes'] == 0
+
+
+def test_registered_path_overrides_root(index_root, tenant_store):
+    manager = IndexManager("/nonexistent", store_factory=tenant_store)
+    manager.register("customer-1", str(Path(index_root) / "globex" / "faiss_index"))
+
+    assert manager.search("customer-1", "x", k=1)[0][0].metadata['source'] == 'globex.pdf'
+
+
+def test_unknown_and_invalid_tenants(index_root, tenant_store):
+    manager = IndexManager(index_root, store_factory=tenant_store)
+
+    with pytest.raises(FileNotFoundError):
+        manager.get("missing")
+    with pytest.raises(ValueError):
+        manager.get("../acme")
+
+
+def test_concurrent_first_queries_load_once(index_root, tenant_store):
+    manager = IndexManager(index_root, store_factory=tenant_store)
+    stores = []
+
+    threads = [threading.Thread(target=lambda: stores.append(manager.get("acme"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert manager.stats()['loads'] == 1
+    assert all(s is stores[0] for s in stores)
+
+
+def test_query_during_slow_load_does_not_load_twice(index_root, tenant_store):
+    manager = IndexManager(index_root, store_factory=tenant_store)
+    measuring = threading.Event()
+    release = threading.Event()
+    index_size = manager.index_size
+
+    def slow_index_size(store):
+        if not measuring.is_set():
+            measuring.set()
+            release.wait(5)
+        return index_size(store)
+
+    manager.index_size = slow_index_size
+    stores = []
+    first = threading.Thread(target=lambda: stores.append(manager.get("acme")))
+    first.start()
+    assert measuring.wait(5)
+
+    # A second first-query arrives while the loaded store is still being measured.
+    second = threading.Thread(target=lambda: stores.append(manager.get("acme")))
+    second.start()
+    second.join(0.2)
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    assert manager.stats()['loads'] == 1
+    assert stores[0] is stores[1]
+    assert manager.stats()['resident_bytes'] == 10 * BYTES_PER_DOC
+
+    manager.evict("acme")
+    assert manager.stats()['resident_bytes'] == 0
+
+
+def test_size_is_refreshed_after_hot_reload(index_root, tenant_store, make_docs):
+    manager = IndexManager(index_root, store_factory=tenant_store)
+    store = manager.get("acme")
+    assert manager.stats()['resident_bytes'] == 10 * BYTES_PER_DOC
+
+    writer = tenant_store(str(Path(index_root) / "acme" / "faiss_index"))
+    writer.add_documents(make_docs(25, source='acme.pdf'))
+    writer.save()
+    assert store.reload() is True
+
+    manager.get("acme")
+    assert manager.stats()['resident_bytes'] == 25 * BYTES_PER_DOC
+
+
+def test_size_includes_query_vectors(index_root, tenant_store):
+    manager = IndexManager(index_root, store_factory=tenant_store)
+    store = manager.get("acme")
+
+    store.precompute_queries(["x", "xx"])
+
+    # Two precomputed 4-dim float32 vectors.
+    assert IndexManager.index_size(store) == 10 * BYTES_PER_DOC + 2 * 16
+
+
+def test_load_locks_do_not_accumulate(index_root, tenant_store):
+    manager = IndexManager(index_root, store_factory=tenant_store)
+
+    manager.get("acme")
+    with pytest.raises(FileNotFoundError):
+        manager.get("missing")
+
+    assert manager._load_locks == {}
+
+
+def test_eviction_stops_reload_outside_manager_lock(index_root, tenant_store):
+    manager = IndexManager(index_root, store_factory=tenant_store)
+    store = manager.get("acme")
+    lock_held = []
+
+    original = store.stop_auto_reload
+
+    def stop_auto_reload():
+        lock_held.append(manager._lock.locked())
+        original()
+
+    store.stop_auto_reload = stop_auto_reload
+    manager.evict("acme")
+
+    assert lock_held == [False]
@@ -0,0 +1,124 @@
+import pytest
+from langchain.schema import Document
+
+
+@pytest.fixture
+def store(index_path, make_store):
+    store = make_store(index_path)
+    store.add_documents([
+        Document(page_content="x" * (i + 1), metadata={'source': f'doc{i}.pdf', 'chunk_id': i})
+        for i in range(5)
+    ])
+    store.save()
+    return store
+
+
+def test_search_by_vector_matches_search(store):
+    by_query = store.search("xxx", k=3)
+    by_vector = store.search_by_vector([3.0, 1.0, 0.0], k=3)
+
+    assert [d.metadata['source'] for d, _ in by_vector] == [d.metadata['source'] for d, _ in by_query]
+    assert by_vector[0][0].metadata['source'] == 'doc2.pdf'
+
+
+def test_search_by_vector_without_index(index_path, make_store):
+    store = make_store(index_path)
+
+    with pytest.raises(RuntimeError):
+        store.search_by_vector([0.0, 0.0, 0.0])
+
+
+def test_precomputed_queries_skip_embed_query(store):
+    embeddings = store.embeddings
+
+    assert store.precompute_queries(["xx", "xxxx", "xx", "  "]) == 2
+    assert embeddings.document_calls == 2
+
+    store.search("xx", k=2)
+    store.search("xxxx", k=2)
+    assert embeddings.query_calls == 0
+
+    store.search("not precomputed", k=2)
+    assert embeddings.query_calls == 1
+
+
+def test_precomputed_queries_persist_with_index(store, index_path, make_store):
+    store.precompute_queries(["xx", "xxxx"])
+
+    reader = make_store(index_path)
+    reader.load()
+
+    assert set(reader.query_vectors) == {"xx", "xxxx"}
+    assert reader.search("xxxx", k=1)[0][0].metadata['source'] == 'doc3.pdf'
+    assert reader.embeddings.query_calls == 0
+
+
+def test_precomputed_queries_are_part_of_the_snapshot(store):
+    indexed_version = store.snapshot_version
+
+    store.precompute_queries(["xx"])
+
+    assert store.snapshot_version != indexed_version
+    assert store.snapshots.current_version() == store.snapshot_version
+    manifest = store.snapshots.verify(store.snapshot_version)
+    assert "queries.npz" in manifest['files']
+
+
+def test_failed_precompute_keeps_previous_vectors(store):
+    store.precompute_queries(["xx"])
+    version = store.snapshot_version
+
+    def fail(staging, extra=None):
+        raise OSError("disk full")
+
+    store.snapshots.commit = fail
+    with pytest.raises(OSError):
+        store.precompute_queries(["xxxx"])
+
+    assert set(store.query_vectors) == {"xx"}
+    assert store.snapshot_version == version
+
+
+def test_precompute_requires_index(index_path, make_store):
+    store = make_store(index_path)
+
+    with pytest.raises(RuntimeError):
+        store.precompute_queries(["xx"])
+
+
+def test_query_vectors_from_other_model_are_ignored(store, index_path, make_store):
+    store.precompute_queries(["xx"])
+
+    reader = make_store(index_path, embedding_model="text-embedding-3-large")
+    reader.load()
+
+    assert reader.query_vectors == {}
+
+
+def test_warm_up_serves_cached_hits(store):
+    store.precompute_queries(["xx", "xxxx"])
+
+    assert store.warm_up(k=3) == 2
+
+    cold = store.search_by_vector([2.0, 1.0, 0.0], k=2)
+    warm = store.search("xx", k=2)
+    assert [(d.metadata['source'], s) for d, s in warm] == [(d.metadata['source'], s) for d, s in cold]
+
+    # Larger k than the warm-up falls back to a real search.
+    assert len(store.search("xx", k=5)) == 5
+
+
+def test_warm_hits_are_not_served_after_reload(store, index_path, make_store):
+    store.precompute_queries(["xx"])
+    store.warm_up(k=2)
+
+    writer = make_store(index_path)
+    writer.add_documents([Document(page_content="xx", metadata={'source': 'new.pdf', 'chunk_id': 0})])
+    writer.save()
+
+    assert store.reload() is True
+    assert store.search("xx", k=1)[0][0].metadata['source'] == 'new.pdf'
+
+    # A fresh ingest carries the precomputed vectors forward into its snapshot.
+    assert set(store.query_vectors) == {"xx"}
+    assert store.embeddings.query_calls == 0
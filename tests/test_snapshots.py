@@ -0,0 +1,217 @@
+import json
+import os
+import threading
+import time
+import pytest
+import tempfile
+from pathlib import Path
+from src.snapshots import SnapshotStore
+
+
+def test_save_writes_snapshot_with_manifest(index_path, make_store, make_docs):
+    store = make_store(index_path)
+    store.add_documents(make_docs(3))
+    store.save()
+
+    version = store.snapshots.current_version()
+    assert version == store.snapshot_version
+
+    snapshot_dir = store.snapshots.path_for(version)
+    manifest = json.loads((snapshot_dir / "manifest.json").read_text())
+    assert set(manifest['files']) == {"index.faiss", "embeddings.npy", "metadata.txt"}
+    assert manifest['num_documents'] == 3
+    assert manifest['dimension'] == 3
+    assert not any(p.name.startswith(".tmp-") for p in store.snapshots.root.iterdir())
+
+
+def test_load_reads_current_snapshot(index_path, make_store, make_docs):
+    writer = make_store(index_path)
+    writer.add_documents(make_docs(3))
+    writer.save()
+
+    reader = make_store(index_path)
+    reader.load()
+
+    assert reader.snapshot_version == writer.snapshot_version
+    assert reader.index.ntotal == 3
+    assert [d.metadata['chunk_id'] for d in reader.documents] == [0, 1, 2]
+
+
+def test_load_rejects_corrupted_snapshot(index_path, make_store, make_docs):
+    store = make_store(index_path)
+    store.add_documents(make_docs(2))
+    store.save()
+
+    snapshot_dir = store.snapshots.path_for(store.snapshot_version)
+    with open(snapshot_dir / "metadata.txt", 'a') as f:
+        f.write("99|tampered.pdf|0\n")
+
+    with pytest.raises(ValueError):
+        make_store(index_path).load()
+
+
+def test_reload_swaps_to_new_snapshot(index_path, make_store, make_docs):
+    writer = make_store(index_path)
+    writer.add_documents(make_docs(2))
+    writer.save()
+
+    reader = make_store(index_path)
+    reader.load()
+    assert reader.reload() is False
+
+    writer.add_documents(make_docs(5, source='new.pdf'))
+    writer.save()
+
+    assert reader.reload() is True
+    assert reader.index.ntotal == 5
+    assert reader.documents[0].metadata['source'] == 'new.pdf'
+
+
+def test_in_flight_search_keeps_old_snapshot(index_path, make_store, make_docs):
+    writer = make_store(index_path)
+    writer.add_documents(make_docs(2))
+    writer.save()
+
+    reader = make_store(index_path)
+    reader.load()
+
+    entered, release = threading.Event(), threading.Event()
+    results = []
+
+    fast = reader.embeddings
+
+    class SlowEmbeddings:
+        def embed_query(self, text):
+            entered.set()
+            release.wait(5)
+            return fast.embed_query(text)
+
+    reader.embeddings = SlowEmbeddings()
+    search = threading.Thread(target=lambda: results.extend(reader.search("x", k=10)))
+    search.start()
+    entered.wait(5)
+
+    writer.add_documents(make_docs(4, source='new.pdf'))
+    writer.save()
+    assert reader.reload() is True
+
+    release.set()
+    search.join(5)
+
+    assert len(results) == 2
+    assert all(doc.metadata['source'] == 'doc.pdf' for doc, _ in results)
+
+
+def test_garbage_collection_keeps_recent_snapshots(index_path, make_store, make_docs):
+    store = make_store(index_path, keep_snapshots=2)
+    store.snapshots.grace_period = 0
+    store.add_documents(make_docs(2))
+    for _ in range(4):
+        store.save()
+
+    versions = store.snapshots.list_versions()
+    assert len(versions) == 2
+    assert store.snapshot_version in versions
+
+
+def test_garbage_collection_spares_recently_superseded_snapshots(index_path, make_store, make_docs):
+    store = make_store(index_path, keep_snapshots=2)
+    store.add_documents(make_docs(2))
+    for _ in range(4):
+        store.save()
+
+    # A reader may still be loading a snapshot that was current a moment ago.
+    assert len(store.snapshots.list_versions()) == 4
+
+    store.snapshots.grace_period = 0
+    assert len(store.snapshots.collect_garbage()) == 2
+    assert store.snapshots.list_versions()[-1] == store.snapshot_version
+
+
+def test_garbage_collection_removes_abandoned_staging(index_path, make_store, make_docs):
+    store = make_store(index_path)
+    store.add_documents(make_docs(2))
+    store.save()
+
+    abandoned = store.snapshots.begin()
+    (abandoned / "index.faiss").write_bytes(b"partial")
+    in_progress = store.snapshots.begin()
+
+    an_hour_ago = time.time() - 3601
+    os.utime(abandoned, (an_hour_ago, an_hour_ago))
+    store.snapshots.collect_garbage()
+
+    assert not abandoned.exists()
+    assert in_progress.exists()
+
+
+def test_auto_reload_survives_unexpected_errors(index_path, make_store, make_docs):
+    writer = make_store(index_path)
+    writer.add_documents(make_docs(2))
+    writer.save()
+
+    reader = make_store(index_path)
+    reader.load()
+    reload = reader.reload
+    failures = []
+
+    def flaky_reload():
+        if not failures:
+            failures.append(True)
+            raise RuntimeError("snapshot removed while loading")
+        return reload()
+
+    reader.reload = flaky_reload
+    writer.add_documents(make_docs(3, source='new.pdf'))
+    writer.save()
+
+    reader.start_auto_reload(interval=0.01)
+    try:
+        deadline = time.time() + 5
+        while reader.snapshot_version != writer.snapshot_version and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        reader.stop_auto_reload()
+
+    assert failures == [True]
+    assert reader.snapshot_version == writer.snapshot_version
+
+
+def test_failed_save_leaves_current_snapshot(index_path, make_store, make_docs):
+    store = make_store(index_path)
+    store.add_documents(make_docs(2))
+    store.save()
+    version = store.snapshot_version
+
+    store.index = None
+    with pytest.raises(Exception):
+        store.save()
+
+    assert store.snapshots.current_version() == version
+    assert store.snapshots.list_versions() == [version]
+    assert not any(p.name.startswith(".tmp-") for p in store.snapshots.root.iterdir())
+
+
+def test_legacy_index_still_loads(index_path, make_store):
+    import faiss
+    import numpy as np
+
+    embeddings = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], dtype='float32')
+    index = faiss.IndexFlatL2(3)
+    index.add(embeddings)
+    faiss.write_index(index, index_path)
+    np.save(index_path.replace(".faiss", "_embeddings.npy"), embeddings)
+    Path(index_path.replace(".faiss", "_metadata.txt")).write_text("0|a.pdf|0\n1|b.pdf|1\n")
+
+    store = make_store(index_path)
+    store.load()
+
+    assert store.snapshot_version is None
+    assert [d.metadata['source'] for d in store.documents] == ['a.pdf', 'b.pdf']
+
+
+def test_snapshot_store_without_pointer():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        snapshots = SnapshotStore(str(Path(tmpdir) / "snaps"))
+        assert snapshots.current_version() is None
+        assert snapshots.list_versions() == []
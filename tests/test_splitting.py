@@ -0,0 +1,133 @@
+import random
+import pytest
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from src.ingestion import DocumentIngester
+from src.splitting import FastTextSplitter
+
+
+SEPARATORS = ["\n\n", "\n", " ", ""]
+
+
+def random_text(seed, length=5000):
+    rng = random.Random(seed)
+    alphabet = ["word", "a", "longerword", " ", " ", "\n", "\n\n", "\n\n\n", "\t", "  ", "x" * 700]
+    parts = []
+    while sum(len(p) for p in parts) < length:
+        parts.append(rng.choice(alphabet))
+    return "".join(parts)
+
+
+def assert_equivalent(text, **kwargs):
+    baseline = RecursiveCharacterTextSplitter(separators=SEPARATORS, **kwargs)
+    fast = FastTextSplitter(separators=SEPARATORS, **kwargs)
+    assert fast.split_text(text) == baseline.split_text(text)
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("chunk_size,chunk_overlap", [(500, 50), (100, 0), (64, 63), (20, 5)])
+def test_matches_recursive_splitter(seed, chunk_size, chunk_overlap):
+    assert_equivalent(random_text(seed), chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "Short text",
+    "   \n\n  \n ",
+    "This is a test document. " * 100,
+    "x" * 2000,
+    "héllo wörld 😀 " * 80,
+    "para one\n\n\npara two\n\n\n\npara three " * 60,
+])
+def test_matches_recursive_splitter_edge_cases(text):
+    assert_equivalent(text, chunk_size=500, chunk_overlap=50)
+    assert_equivalent(text, chunk_size=7, chunk_overlap=3)
+
+
+def test_matches_recursive_splitter_with_custom_length():
+    text = random_text(1)
+
+    def vowel_weighted(s):
+        return len(s) + sum(s.count(v) for v in "aeiou")
+
+    assert_equivalent(text, chunk_size=200, chunk_overlap=20, length_function=vowel_weighted)
+
+
+def test_matches_recursive_splitter_with_tokens():
+    tiktoken = pytest.importorskip("tiktoken")
+    try:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        pytest.skip("cl100k_base encoding unavailable offline")
+
+    text = random_text(2)
+    baseline = RecursiveCharacterTextSplitter(
+        chunk_size=64, chunk_overlap=8, separators=SEPARATORS,
+        length_function=lambda s: len(encoding.encode_ordinary(s))
+    )
+    fast = FastTextSplitter.from_tiktoken_encoder(chunk_size=64, chunk_overlap=8, separators=SEPARATORS)
+
+    assert fast.split_text(text) == baseline.split_text(text)
+
+
+def test_spans_reference_source_text():
+    text = random_text(3)
+    splitter = FastTextSplitter(chunk_size=300, chunk_overlap=30)
+
+    spans = splitter.split_spans(text)
+    assert [text[start:end] for start, end in spans] == splitter.split_text(text)
+    assert all(0 <= start < end <= len(text) for start, end in spans)
+
+
+def test_split_documents_keeps_metadata():
+    docs = [Document(page_content="alpha beta gamma " * 50, metadata={'source': 'a.pdf', 'page': 3})]
+    chunks = FastTextSplitter(chunk_size=100, chunk_overlap=10).split_documents(docs)
+
+    assert len(chunks) > 1
+    assert all(c.metadata == {'source': 'a.pdf', 'page': 3} for c in chunks)
+
+
+def test_split_documents_adds_start_index():
+    docs = [Document(page_content="alpha beta gamma " * 50, metadata={'source': 'a.pdf'})]
+    baseline = RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=10, add_start_index=True)
+    chunks = FastTextSplitter(chunk_size=100, chunk_overlap=10, add_start_index=True).split_documents(docs)
+
+    assert [c.metadata for c in chunks] == [c.metadata for c in baseline.split_documents(docs)]
+    assert all(docs[0].page_content[c.metadata['start_index']:].startswith(c.page_content) for c in chunks)
+
+
+def test_rejects_overlap_larger_than_chunk():
+    with pytest.raises(ValueError):
+        FastTextSplitter(chunk_size=10, chunk_overlap=20)
+
+
+def test_ingester_fast_splitter_matches_default():
+    text = "This is a test document.\n\nWith paragraphs. " * 100
+    default = DocumentIngester().ingest_text(text, source="s")
+    fast = DocumentIngester(fast_splitter=True).ingest_text(text, source="s")
+
+    assert [c.page_content for c in fast] == [c.page_content for c in default]
+    assert [c.metadata for c in fast] == [c.metadata for c in default]
+
+
+class WordEncoding:
+    """Stands in for a tiktoken encoding, which needs a download: one token per word."""
+
+    def encode(self, text, **kwargs):
+        return text.split()
+
+    def encode_ordinary(self, text):
+        return text.split()
+
+
+def test_ingester_token_sizing(monkeypatch):
+    tiktoken = pytest.importorskip("tiktoken")
+    monkeypatch.setattr(tiktoken, "get_encoding", lambda name: WordEncoding())
+    text = random_text(4)
+
+    default = DocumentIngester(chunk_size=40, chunk_overlap=5, token_encoding="words").ingest_text(text)
+    fast = DocumentIngester(chunk_size=40, chunk_overlap=5, fast_splitter=True, token_encoding="words").ingest_text(text)
+
+    assert [c.page_content for c in fast] == [c.page_content for c in default]
+    assert all(len(c.page_content.split()) <= 40 for c in fast)
+    assert max(len(c.page_content) for c in fast) > 40